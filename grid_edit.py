@@ -0,0 +1,115 @@
+import numpy as np
+
+
+MODES = ('set', 'or', 'xor', 'and')
+
+
+def as_mask(mask):
+    """2次元のマスク（配列または入れ子のリスト）をブール配列にする"""
+    mask = np.asarray(mask)
+    if mask.ndim != 2:
+        raise ValueError(f"mask must be 2-D, got shape {mask.shape}")
+    return mask.astype(bool)
+
+
+def coords_to_mask(coords):
+    """座標列 [(dx, dy), ...] または形状 (N, 2) の配列をブールマスクにする"""
+    coords = np.asarray(coords, dtype=int)
+    if coords.size == 0:
+        return np.zeros((0, 0), dtype=bool)
+    if coords.ndim != 2 or coords.shape[1] != 2:
+        raise ValueError(f"coords must have shape (N, 2), got {coords.shape}")
+    if (coords < 0).any():
+        raise ValueError("pattern coordinates must be non-negative")
+    mask = np.zeros((coords[:, 1].max() + 1, coords[:, 0].max() + 1), dtype=bool)
+    mask[coords[:, 1], coords[:, 0]] = True
+    return mask
+
+
+def transform(mask, rotation=0, flip_x=False, flip_y=False):
+    """反転してから rotation 度（90の倍数、時計回り）回転する"""
+    if rotation % 90 != 0:
+        raise ValueError(f"rotation must be a multiple of 90, got {rotation}")
+    if flip_x:
+        mask = mask[:, ::-1]
+    if flip_y:
+        mask = mask[::-1, :]
+    return np.rot90(mask, -(rotation // 90) % 4)
+
+
+def combine(old, mask, mode='set'):
+    if mode == 'set':
+        return mask
+    if mode == 'or':
+        return old | mask
+    if mode == 'xor':
+        return old ^ mask
+    if mode == 'and':
+        return old & mask
+    raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+
+
+def _axis(start, length, size, wrap):
+    if wrap:
+        return np.arange(start, start + length) % size, slice(None)
+    lo, hi = max(start, 0), min(start + length, size)
+    if lo >= hi:
+        return None
+    return slice(lo, hi), slice(lo - start, hi - start)
+
+
+def region(shape, x, y, width, height, wrap=False):
+    """盤面上の矩形の添字と、それに対応する矩形内の添字を返す
+
+    wrap=False ならはみ出した部分は切り捨て、True なら反対側に回り込む。
+    矩形が盤面と重ならない場合は None を返す。
+    """
+    rows = _axis(y, height, shape[0], wrap)
+    cols = _axis(x, width, shape[1], wrap)
+    if rows is None or cols is None:
+        return None
+    if wrap:
+        return np.ix_(rows[0], cols[0]), (rows[1], cols[1])
+    return (rows[0], cols[0]), (rows[1], cols[1])
+
+
+def paste(grid, mask, x, y, mode='set', wrap=False):
+    """mask を (x, y) に一括で書き込む
+
+    wrap=True では盤面より大きい mask は受け付けない。
+
+    書き込んだ盤面の添字と書き込み前の値を返す（重ならなければ None）。
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+    # 回り込むと同じセルに複数回書き込むことになり、結果が定まらない
+    if wrap and (mask.shape[0] > grid.shape[0] or mask.shape[1] > grid.shape[1]):
+        raise ValueError(
+            f"mask {mask.shape} is larger than the board {grid.shape} with wrap=True")
+    found = region(grid.shape, x, y, mask.shape[1], mask.shape[0], wrap)
+    if found is None:
+        return None
+    index, src = found
+    before = grid[index].astype(bool)
+    grid[index] = combine(before, mask[src], mode)
+    return index, before
+
+
+def extract(grid, x, y, width, height, wrap=False):
+    """矩形領域のコピーを返す（盤面外は死んだセル）"""
+    out = np.zeros((height, width), dtype=grid.dtype)
+    found = region(grid.shape, x, y, width, height, wrap)
+    if found is not None:
+        index, src = found
+        out[src] = grid[index]
+    return out
+
+
+def cell_index(shape, xs, ys, wrap=False):
+    """座標配列を盤面の添字 (ys, xs) に変換する"""
+    xs = np.asarray(xs, dtype=int).ravel()
+    ys = np.asarray(ys, dtype=int).ravel()
+    if wrap:
+        return ys % shape[0], xs % shape[1]
+    inside = (xs >= 0) & (xs < shape[1]) & (ys >= 0) & (ys < shape[0])
+    return ys[inside], xs[inside]
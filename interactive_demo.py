@@ -35,9 +35,8 @@ def main():
     # いくつかのランダムセル
     import numpy as np
     np.random.seed(42)
-    for _ in range(20):
-        x, y = np.random.randint(0, game.width), np.random.randint(0, game.height)
-        game.set_cell(x, y, 1)
+    coords = np.random.randint(0, [game.width, game.height], (20, 2))
+    game.set_cells(coords[:, 0], coords[:, 1], 1)
     
     print("✅ Patterns loaded!")
     print()
@@ -4,6 +4,8 @@ import matplotlib.animation as animation
 import time
 import os
 
+import grid_edit
+
 
 class LifeGame:
     def __init__(self, width=50, height=50):
@@ -16,6 +18,37 @@ class LifeGame:
         if 0 <= x < self.width and 0 <= y < self.height:
             self.grid[y, x] = state
     
+    def set_cells(self, xs, ys, state=1, wrap=False):
+        """座標配列で指定したセルを一括で設定する"""
+        index = grid_edit.cell_index(self.grid.shape, xs, ys, wrap)
+        self.grid[index] = state
+    
+    def stamp_mask(self, mask, x=0, y=0, rotation=0, flip_x=False, flip_y=False,
+                   mode='or', wrap=False):
+        """2次元マスクを変形して一括で書き込む"""
+        mask = grid_edit.transform(grid_edit.as_mask(mask), rotation, flip_x, flip_y)
+        grid_edit.paste(self.grid, mask, x, y, mode, wrap)
+    
+    def stamp_coords(self, coords, x=0, y=0, rotation=0, flip_x=False, flip_y=False,
+                     mode='or', wrap=False):
+        """相対座標 [(dx, dy), ...] のパターンを変形して一括で書き込む"""
+        self.stamp_mask(grid_edit.coords_to_mask(coords), x, y, rotation,
+                        flip_x, flip_y, mode, wrap)
+    
+    def fill_rect(self, x, y, width, height, state=1, wrap=False):
+        mask = np.full((height, width), bool(state))
+        grid_edit.paste(self.grid, mask, x, y, 'set', wrap)
+    
+    def randomize_rect(self, x, y, width, height, density=0.3, mode='set', wrap=False):
+        mask = np.random.random((height, width)) < density
+        grid_edit.paste(self.grid, mask, x, y, mode, wrap)
+    
+    def copy_region(self, x, y, width, height, wrap=False):
+        return grid_edit.extract(self.grid, x, y, width, height, wrap)
+    
+    def paste_region(self, region, x, y, mode='set', wrap=False):
+        self.stamp_mask(region, x, y, mode=mode, wrap=wrap)
+    
     def get_neighbors_count(self, x, y):
         count = 0
         for dx in [-1, 0, 1]:
@@ -56,18 +89,15 @@ class LifeGame:
     
     def set_glider(self, start_x=1, start_y=1):
         pattern = [(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)]
-        for dx, dy in pattern:
-            self.set_cell(start_x + dx, start_y + dy, 1)
+        self.stamp_coords(pattern, start_x, start_y)
     
     def set_blinker(self, start_x=10, start_y=10):
         pattern = [(0, 0), (1, 0), (2, 0)]
-        for dx, dy in pattern:
-            self.set_cell(start_x + dx, start_y + dy, 1)
+        self.stamp_coords(pattern, start_x, start_y)
     
     def set_block(self, start_x=20, start_y=20):
         pattern = [(0, 0), (0, 1), (1, 0), (1, 1)]
-        for dx, dy in pattern:
-            self.set_cell(start_x + dx, start_y + dy, 1)
+        self.stamp_coords(pattern, start_x, start_y)
     
     def print_grid(self):
         os.system('clear' if os.name == 'posix' else 'cls')
@@ -129,15 +159,19 @@ def main():
         game.set_block()
     elif choice == "5":
         print("Enter coordinates for live cells (format: x,y). Press Enter when done.")
+        coords = []
         while True:
             coord = input("Coordinate: ").strip()
             if not coord:
                 break
             try:
                 x, y = map(int, coord.split(','))
-                game.set_cell(x, y, 1)
+                coords.append((x, y))
             except ValueError:
                 print("Invalid format. Use x,y")
+        if coords:
+            xs, ys = zip(*coords)
+            game.set_cells(xs, ys, 1)
     
     generations = int(input("Number of generations (default 50): ") or "50")
     
@@ -7,6 +7,9 @@ from collections import defaultdict
 import time
 import os
 
+import grid_edit
+from run_recorder import RunRecorder, RunReplay
+
 
 class RichLifeGame:
     def __init__(self, width=50, height=50):
@@ -19,6 +22,7 @@ class RichLifeGame:
         self.birth_count = 0
         self.death_count = 0
         self.max_age = 0
+        self.recorder = None
         
         # カラーテーマ設定
         self.themes = {
@@ -38,6 +42,49 @@ class RichLifeGame:
                 self.cell_age[y, x] = 1
             else:
                 self.cell_age[y, x] = 0
+            if self._recording():
+                self.recorder.mark_dirty()
+    
+    def _after_edit(self, index, before):
+        # 新たに生まれたセルは年齢1、死んだセルは0、生き続けたセルはそのまま
+        after = self.grid[index].astype(bool)
+        self.cell_age[index] = np.where(after, np.where(before, self.cell_age[index], 1), 0)
+        if self._recording():
+            self.recorder.mark_dirty()
+    
+    def set_cells(self, xs, ys, state=1, wrap=False):
+        """座標配列で指定したセルを一括で設定する"""
+        index = grid_edit.cell_index(self.grid.shape, xs, ys, wrap)
+        before = self.grid[index].astype(bool)
+        self.grid[index] = state
+        self._after_edit(index, before)
+    
+    def stamp_mask(self, mask, x=0, y=0, rotation=0, flip_x=False, flip_y=False,
+                   mode='or', wrap=False):
+        """2次元マスクを変形して一括で書き込む"""
+        mask = grid_edit.transform(grid_edit.as_mask(mask), rotation, flip_x, flip_y)
+        edited = grid_edit.paste(self.grid, mask, x, y, mode, wrap)
+        if edited is not None:
+            self._after_edit(*edited)
+    
+    def stamp_coords(self, coords, x=0, y=0, rotation=0, flip_x=False, flip_y=False,
+                     mode='or', wrap=False):
+        """相対座標 [(dx, dy), ...] のパターンを変形して一括で書き込む"""
+        self.stamp_mask(grid_edit.coords_to_mask(coords), x, y, rotation,
+                        flip_x, flip_y, mode, wrap)
+    
+    def fill_rect(self, x, y, width, height, state=1, wrap=False):
+        self.stamp_mask(np.full((height, width), bool(state)), x, y, mode='set', wrap=wrap)
+    
+    def randomize_rect(self, x, y, width, height, density=0.3, mode='set', wrap=False):
+        mask = np.random.random((height, width)) < density
+        self.stamp_mask(mask, x, y, mode=mode, wrap=wrap)
+    
+    def copy_region(self, x, y, width, height, wrap=False):
+        return grid_edit.extract(self.grid, x, y, width, height, wrap)
+    
+    def paste_region(self, region, x, y, mode='set', wrap=False):
+        self.stamp_mask(region, x, y, mode=mode, wrap=wrap)
     
     def get_neighbors_count(self, x, y):
         count = 0
@@ -51,6 +98,8 @@ class RichLifeGame:
         return count
     
     def next_generation(self):
+        if self._recording():
+            self.recorder.flush(self)
         new_grid = np.zeros_like(self.grid)
         new_age = np.zeros_like(self.cell_age)
         births = 0
@@ -80,8 +129,38 @@ class RichLifeGame:
         self.birth_count = births
         self.death_count = deaths
         self.population_history.append(np.sum(self.grid))
+        if self._recording():
+            self.recorder.record(self)
+    
+    def start_recording(self, path, keyframe_interval=50):
+        """現在の世代から差分記録を開始する（終了は stop_recording()）"""
+        self.stop_recording()
+        self.recorder = RunRecorder(path, self.width, self.height,
+                                    keyframe_interval=keyframe_interval,
+                                    population_history=self.population_history)
+        self.recorder.record(self)
+    
+    def _recording(self):
+        # 外部で close() された記録は手放す
+        if self.recorder is not None and self.recorder.closed:
+            self.recorder = None
+        return self.recorder is not None
+    
+    def stop_recording(self):
+        if self._recording():
+            self.recorder.flush(self)
+            self.recorder.close()
+            self.recorder = None
+    
+    def replay_to(self, path, generation):
+        """記録ファイルから指定世代の状態を復元する"""
+        self.stop_recording()
+        with RunReplay(path) as replay:
+            replay.restore(self, generation)
     
     def clear(self):
+        # 世代番号が巻き戻るため記録は終了する
+        self.stop_recording()
         self.grid = np.zeros((self.height, self.width), dtype=int)
         self.cell_age = np.zeros((self.height, self.width), dtype=int)
         self.generation = 0
@@ -89,6 +168,7 @@ class RichLifeGame:
         self.max_age = 0
     
     def random_pattern(self, density=0.3):
+        self.stop_recording()
         self.grid = np.random.choice([0, 1], size=(self.height, self.width), 
                                    p=[1-density, density])
         self.cell_age = self.grid.copy()
@@ -97,8 +177,7 @@ class RichLifeGame:
     
     def set_glider(self, start_x=1, start_y=1):
         pattern = [(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)]
-        for dx, dy in pattern:
-            self.set_cell(start_x + dx, start_y + dy, 1)
+        self.stamp_coords(pattern, start_x, start_y)
     
     def set_gosper_gun(self, start_x=5, start_y=5):
         gun_pattern = [
@@ -108,9 +187,7 @@ class RichLifeGame:
             (0, 5), (1, 5), (10, 5), (14, 5), (16, 5), (17, 5), (22, 5), 
             (24, 5), (10, 6), (16, 6), (24, 6), (11, 7), (15, 7), (12, 8), (13, 8)
         ]
-        for dx, dy in gun_pattern:
-            if start_x + dx < self.width and start_y + dy < self.height:
-                self.set_cell(start_x + dx, start_y + dy, 1)
+        self.stamp_coords(gun_pattern, start_x, start_y)
     
     def set_pulsar(self, start_x=10, start_y=10):
         pulsar_pattern = [
@@ -125,9 +202,7 @@ class RichLifeGame:
             (0, 10), (5, 10), (7, 10), (12, 10),
             (2, 12), (3, 12), (4, 12), (8, 12), (9, 12), (10, 12)
         ]
-        for dx, dy in pulsar_pattern:
-            if start_x + dx < self.width and start_y + dy < self.height:
-                self.set_cell(start_x + dx, start_y + dy, 1)
+        self.stamp_coords(pulsar_pattern, start_x, start_y)
     
     def create_age_colormap(self):
         if self.max_age <= 1:
@@ -163,8 +238,7 @@ class RichLifeGame:
                 x, y = int(event.xdata + 0.5), int(event.ydata + 0.5)
                 if 0 <= x < self.width and 0 <= y < self.height:
                     # セルの状態を切り替え
-                    current_state = self.grid[y, x]
-                    self.set_cell(x, y, 1 - current_state)
+                    self.stamp_coords([(0, 0)], x, y, mode='xor')
                     # 即座に表示更新
                     plt.draw()
         
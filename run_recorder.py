@@ -0,0 +1,334 @@
+import json
+import struct
+import zlib
+
+import numpy as np
+
+
+MAGIC = b'LGREC1\n'
+KEYFRAME = b'K'
+DELTA = b'D'
+
+_RECORD_HEADER = struct.Struct('<cI')
+_FOOTER_OFFSET = struct.Struct('<Q')
+_KEYFRAME_STATS = struct.Struct('<qqqIB')
+_AGE_DTYPES = (np.uint8, np.uint16, np.uint32)
+# 差分の圧縮辞書に使う直前の差分の数（周期3の振動子なども拾える）
+_DELTA_DICTIONARY = 6
+
+
+def _varint_encode(values):
+    """非負整数の配列を7ビットずつの可変長バイト列にする"""
+    values = np.asarray(values, dtype=np.uint64)
+    lengths = np.ones(values.size, dtype=np.int64)
+    for k in range(1, 10):
+        lengths += values >= np.uint64(1 << (7 * k))
+    starts = np.cumsum(lengths) - lengths
+    out = np.empty(int(lengths.sum()), dtype=np.uint8)
+    for k in range(int(lengths.max(initial=0))):
+        sel = lengths > k
+        byte = (values[sel] >> np.uint64(7 * k)) & np.uint64(0x7f)
+        more = (lengths[sel] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[sel] + k] = byte | more
+    return out.tobytes()
+
+
+def _varint_decode(data):
+    data = np.frombuffer(data, dtype=np.uint8)
+    if data.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    shift = 7 * (np.arange(data.size) - np.repeat(starts, ends - starts + 1))
+    parts = (data & 0x7f).astype(np.int64) << shift
+    return np.add.reduceat(parts, starts)
+
+
+class RunRecorder:
+    """世代ごとの誕生・死亡差分を記録するレコーダー
+
+    各世代は前の世代との差分（反転したセル位置の間隔を可変長整数にしたもの）を
+    直前の差分を辞書として圧縮して保存し、
+    keyframe_interval 世代ごとに完全なキーフレームを書き込む。
+    ファイル末尾には世代からファイルオフセットへの索引を置く。
+    """
+
+    def __init__(self, path, width, height, keyframe_interval=50,
+                 population_history=None, compress_level=6):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.keyframe_interval = keyframe_interval
+        self.compress_level = compress_level
+        self.history_base = [int(p) for p in (population_history or [])]
+
+        self.generations = []
+        self.offsets = []
+        self.kinds = []
+        self.populations = []
+
+        self._prev_grid = None
+        self._recent_deltas = []
+        self._since_keyframe = 0
+        self._dirty = False
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._file is None
+
+    def mark_dirty(self):
+        """世代更新以外の編集があったことを記録する
+
+        編集後の状態は flush() でその世代の記録をキーフレームに置き換えて
+        書き直すため、編集のあった世代ごとにキーフレーム1つ分の容量を使う。
+        """
+        self._dirty = True
+
+    def flush(self, game):
+        """編集があれば現在の世代をキーフレームで記録し直す"""
+        if self._dirty and self.generations:
+            self.record(game)
+
+    def record(self, game):
+        if self._file is None:
+            raise ValueError("recorder is closed")
+        last = self.generations[-1] if self.generations else None
+        # 編集された世代だけは同じ世代番号で記録し直せる
+        rewrite = game.generation == last and self._dirty
+        if last is not None and game.generation <= last and not rewrite:
+            raise ValueError(
+                f"generation {game.generation} is not after "
+                f"{last}")
+
+        grid = game.grid.astype(bool)
+        need_keyframe = (self._prev_grid is None or self._dirty or
+                         self._since_keyframe >= self.keyframe_interval)
+
+        if rewrite:
+            # 編集前の記録は索引の最後の記録なので、その位置から上書きする
+            self._file.seek(self.offsets[-1])
+            self._file.truncate()
+        offset = self._file.tell()
+        if need_keyframe:
+            self._write_record(KEYFRAME, self._encode_keyframe(game, grid))
+            self._recent_deltas = []
+            self._since_keyframe = 0
+            self._dirty = False
+        else:
+            payload = self._encode_delta(grid)
+            self._write_record(DELTA, payload,
+                               b''.join(self._recent_deltas[-_DELTA_DICTIONARY:]))
+            self._recent_deltas.append(payload)
+        self._since_keyframe += 1
+
+        self._prev_grid = grid
+        if rewrite:
+            # population_history は世代更新時の値なのでそのまま残す
+            self.offsets[-1] = offset
+            self.kinds[-1] = 'K'
+            return
+
+        self.generations.append(int(game.generation))
+        self.offsets.append(offset)
+        self.kinds.append('K' if need_keyframe else 'D')
+        self.populations.append(int(grid.sum()))
+
+    def close(self):
+        if self._file is None:
+            return
+        footer = {
+            'width': self.width,
+            'height': self.height,
+            'keyframe_interval': self.keyframe_interval,
+            'history_base': self.history_base,
+            'generations': self.generations,
+            'offsets': self.offsets,
+            'kinds': ''.join(self.kinds),
+            'populations': self.populations,
+        }
+        footer_offset = self._file.tell()
+        self._file.write(zlib.compress(json.dumps(footer).encode('utf-8'),
+                                       self.compress_level))
+        self._file.write(_FOOTER_OFFSET.pack(footer_offset))
+        self._file.close()
+        self._file = None
+
+    def _write_record(self, kind, payload, zdict=b''):
+        if zdict:
+            compressor = zlib.compressobj(self.compress_level, zdict=zdict)
+            payload = compressor.compress(payload) + compressor.flush()
+        else:
+            payload = zlib.compress(payload, self.compress_level)
+        self._file.write(_RECORD_HEADER.pack(kind, len(payload)))
+        self._file.write(payload)
+
+    def _encode_keyframe(self, game, grid):
+        # 生きているセルの年齢だけを、収まる最小の型で保存する
+        ages = getattr(game, 'cell_age', grid)[grid]
+        oldest = int(ages.max()) if ages.size else 0
+        age_type = next(i for i, t in enumerate(_AGE_DTYPES)
+                        if oldest <= np.iinfo(t).max)
+        stats = _KEYFRAME_STATS.pack(
+            int(getattr(game, 'max_age', 0)),
+            int(getattr(game, 'birth_count', 0)),
+            int(getattr(game, 'death_count', 0)),
+            ages.size, age_type)
+        return (stats + np.packbits(grid).tobytes() +
+                ages.astype(_AGE_DTYPES[age_type]).tobytes())
+
+    def _encode_delta(self, grid):
+        flipped = np.flatnonzero(self._prev_grid ^ grid)
+        return _varint_encode(np.diff(flipped, prepend=-1))
+
+
+class RunReplay:
+    """RunRecorder で記録したファイルの任意世代へのシーク再生"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        if self._file.read(len(MAGIC)) != MAGIC:
+            self._file.close()
+            raise ValueError(f"{path} is not a life game recording")
+
+        # close() されなかった記録には末尾の索引がない
+        end = self._file.seek(0, 2) - _FOOTER_OFFSET.size
+        footer = None
+        if end > len(MAGIC):
+            self._file.seek(end)
+            footer_offset, = _FOOTER_OFFSET.unpack(self._file.read(_FOOTER_OFFSET.size))
+            if len(MAGIC) <= footer_offset < end:
+                self._file.seek(footer_offset)
+                try:
+                    footer = json.loads(zlib.decompress(
+                        self._file.read(end - footer_offset)).decode('utf-8'))
+                except (zlib.error, ValueError):
+                    footer = None
+        if footer is None:
+            self._file.close()
+            raise ValueError(
+                f"recording {path} is incomplete (was stop_recording() called?)")
+
+        self.width = footer['width']
+        self.height = footer['height']
+        self.keyframe_interval = footer['keyframe_interval']
+        self.history_base = footer['history_base']
+        self.generations = footer['generations']
+        self.offsets = footer['offsets']
+        self.kinds = footer['kinds']
+        self.populations = footer['populations']
+        self._index = {g: i for i, g in enumerate(self.generations)}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return len(self.generations)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def seek(self, generation):
+        """指定世代の状態を dict で返す
+
+        直前のキーフレームを読み込み、そこから差分を順に適用する。
+        """
+        if generation not in self._index:
+            raise KeyError(f"generation {generation} was not recorded")
+        target = self._index[generation]
+        start = self.kinds.rindex('K', 0, target + 1)
+
+        state = self._decode_keyframe(self._read_record(start, KEYFRAME))
+        recent = []
+        for i in range(start + 1, target + 1):
+            payload = self._read_record(i, DELTA, b''.join(recent[-_DELTA_DICTIONARY:]))
+            self._apply_delta(state, payload)
+            recent.append(payload)
+
+        state['generation'] = generation
+        state['population_history'] = (
+            self.history_base + self.populations[1:target + 1])
+        return state
+
+    def restore(self, game, generation):
+        """game の状態を指定世代に戻す"""
+        if (game.width, game.height) != (self.width, self.height):
+            raise ValueError(
+                f"grid size {game.width}x{game.height} does not match "
+                f"recording {self.width}x{self.height}")
+        state = self.seek(generation)
+        # 世代番号が巻き戻るので、記録中なら先に終了させる
+        if getattr(game, 'recorder', None) is not None:
+            game.stop_recording()
+        game.grid = state['grid']
+        game.generation = state['generation']
+        if hasattr(game, 'cell_age'):
+            game.cell_age = state['cell_age']
+            game.population_history = state['population_history']
+            game.birth_count = state['birth_count']
+            game.death_count = state['death_count']
+            game.max_age = state['max_age']
+        return game
+
+    def _read_record(self, i, expected_kind, zdict=b''):
+        self._file.seek(self.offsets[i])
+        kind, length = _RECORD_HEADER.unpack(self._file.read(_RECORD_HEADER.size))
+        if kind != expected_kind:
+            raise ValueError(f"corrupt recording at generation {self.generations[i]}")
+        data = self._file.read(length)
+        if zdict:
+            decompressor = zlib.decompressobj(zdict=zdict)
+            return decompressor.decompress(data) + decompressor.flush()
+        return zlib.decompress(data)
+
+    def _decode_keyframe(self, payload):
+        max_age, births, deaths, n_ages, age_type = _KEYFRAME_STATS.unpack_from(payload)
+        size = self.width * self.height
+        packed_len = (size + 7) // 8
+        pos = _KEYFRAME_STATS.size
+        alive = np.unpackbits(np.frombuffer(payload, np.uint8, packed_len, pos),
+                              count=size).astype(bool).reshape(self.height, self.width)
+        ages = np.frombuffer(payload, _AGE_DTYPES[age_type], n_ages, pos + packed_len)
+
+        cell_age = np.zeros((self.height, self.width), dtype=int)
+        cell_age[alive] = ages
+        return {
+            'grid': alive.astype(int),
+            'cell_age': cell_age,
+            'max_age': max_age,
+            'birth_count': births,
+            'death_count': deaths,
+        }
+
+    def _apply_delta(self, state, payload):
+        flipped = np.cumsum(_varint_decode(payload)) - 1
+        grid = state['grid']
+        old_alive = grid.astype(bool)
+        grid.flat[flipped] ^= 1
+        alive = grid.astype(bool)
+
+        # RichLifeGame.next_generation と同じ規則で年齢を進める
+        survived = old_alive & alive
+        cell_age = state['cell_age']
+        cell_age[survived] += 1
+        cell_age[alive & ~old_alive] = 1
+        cell_age[~alive] = 0
+
+        if survived.any():
+            state['max_age'] = max(state['max_age'], int(cell_age[survived].max()))
+        born = int(alive.flat[flipped].sum())
+        state['birth_count'] = born
+        state['death_count'] = int(flipped.size) - born
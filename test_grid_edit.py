@@ -0,0 +1,156 @@
+import numpy as np
+import pytest
+
+import grid_edit
+from lifegame import LifeGame
+from rich_lifegame import RichLifeGame
+
+
+GLIDER = [(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)]
+
+
+def assert_ages_consistent(game):
+    np.testing.assert_array_equal(game.cell_age > 0, game.grid == 1)
+
+
+def test_coords_array_matches_coordinate_list():
+    expected = LifeGame(10, 10)
+    expected.set_glider(1, 1)
+    game = LifeGame(10, 10)
+    game.stamp_coords(np.array(GLIDER), 1, 1)
+    np.testing.assert_array_equal(game.grid, expected.grid)
+
+
+def test_nested_list_mask():
+    game = LifeGame(5, 5)
+    game.stamp_mask([[1, 0, 1], [0, 1, 0]], 1, 1)
+    np.testing.assert_array_equal(game.grid[1:3, 1:4], [[1, 0, 1], [0, 1, 0]])
+    assert game.grid.sum() == 3
+
+
+@pytest.mark.parametrize('pattern', [[[1, 0, 1], [0, 1, 0]], [1, 2, 3], np.zeros((2, 2, 2))])
+def test_bad_coords_shape_raises(pattern):
+    with pytest.raises(ValueError):
+        grid_edit.coords_to_mask(pattern)
+
+
+def test_bad_mask_shape_raises():
+    with pytest.raises(ValueError):
+        LifeGame(5, 5).stamp_mask([1, 0, 1])
+    with pytest.raises(ValueError):
+        LifeGame(5, 5).stamp_coords([(-1, 0)])
+
+
+def test_transform():
+    mask = grid_edit.coords_to_mask(GLIDER)
+    np.testing.assert_array_equal(grid_edit.transform(mask, 360), mask)
+    np.testing.assert_array_equal(
+        grid_edit.transform(grid_edit.transform(mask, 90), 270), mask)
+    np.testing.assert_array_equal(
+        grid_edit.transform(np.array([[1, 0], [0, 0]], bool), 90), [[0, 1], [0, 0]])
+    np.testing.assert_array_equal(
+        grid_edit.transform(mask, flip_x=True), mask[:, ::-1])
+    with pytest.raises(ValueError):
+        grid_edit.transform(mask, 45)
+
+
+def test_stamp_clips_at_every_edge():
+    for x, y, expected in [(-1, -1, 4), (8, 8, 4), (-1, 8, 4), (9, 9, 1), (10, 0, 0)]:
+        game = LifeGame(10, 10)
+        game.stamp_mask(np.ones((3, 3), bool), x, y)
+        assert game.grid.sum() == expected, (x, y)
+
+
+def test_stamp_wraps_around():
+    game = LifeGame(10, 10)
+    game.stamp_mask(np.ones((3, 3), bool), 8, 9, wrap=True)
+    assert game.grid.sum() == 9
+    assert game.grid[0, 0] == game.grid[9, 8] == game.grid[1, 9] == 1
+    assert game.grid[2, 0] == 0
+
+
+@pytest.mark.parametrize('mode, expected', [
+    ('set', [[1, 0], [1, 0]]),
+    ('or', [[1, 1], [1, 0]]),
+    ('xor', [[0, 1], [1, 0]]),
+    ('and', [[1, 0], [0, 0]]),
+])
+def test_combine_modes(mode, expected):
+    game = RichLifeGame(2, 2)
+    game.stamp_mask([[1, 1], [0, 0]], 0, 0, mode='set')
+    game.stamp_mask([[1, 0], [1, 0]], 0, 0, mode=mode)
+    np.testing.assert_array_equal(game.grid, expected)
+    assert_ages_consistent(game)
+
+
+def test_unknown_mode_raises():
+    with pytest.raises(ValueError):
+        LifeGame(5, 5).stamp_mask(np.ones((2, 2)), mode='nand')
+
+
+def test_fill_and_randomize_rect():
+    game = RichLifeGame(10, 10)
+    game.fill_rect(-2, -2, 5, 5)
+    assert game.grid.sum() == 9
+    assert_ages_consistent(game)
+    game.fill_rect(0, 0, 2, 2, state=0)
+    assert game.grid.sum() == 5
+    np.random.seed(0)
+    game.randomize_rect(5, 5, 5, 5, density=1.0)
+    assert game.grid[5:, 5:].all()
+    assert_ages_consistent(game)
+
+
+def test_bulk_edit_keeps_survivor_ages():
+    game = RichLifeGame(10, 10)
+    game.fill_rect(0, 0, 2, 2)
+    game.next_generation()
+    assert (game.cell_age[:2, :2] == 2).all()
+    game.stamp_mask(np.ones((3, 3), bool), 0, 0, mode='or')
+    assert (game.cell_age[:2, :2] == 2).all()
+    assert game.cell_age[2, 2] == 1
+    assert_ages_consistent(game)
+
+
+def test_copy_and_paste_region_between_boards():
+    source = RichLifeGame(10, 10)
+    source.set_glider(0, 0)
+    region = source.copy_region(-1, -1, 5, 5)
+    assert region.shape == (5, 5)
+    assert region.sum() == 5
+
+    target = RichLifeGame(10, 10)
+    target.paste_region(region, 7, 7, wrap=True)
+    assert target.grid.sum() == 5
+    np.testing.assert_array_equal(
+        target.copy_region(7, 7, 5, 5, wrap=True), region)
+    assert_ages_consistent(target)
+
+
+def test_set_cells_clips_or_wraps():
+    game = RichLifeGame(5, 5)
+    game.set_cells([0, 4, 5, -1], [0, 4, 0, 2])
+    assert game.grid.sum() == 2
+    game.set_cells([5, -1], [0, 2], wrap=True)
+    assert game.grid[0, 0] == 1 and game.grid[2, 4] == 1
+    assert game.grid.sum() == 3
+    game.set_cells([0, 4], [0, 4], state=0)
+    assert game.grid.sum() == 1
+    assert_ages_consistent(game)
+
+
+@pytest.mark.parametrize('shape', [(5, 5), (4, 3), (3, 4)])
+def test_wrapped_stamp_larger_than_board_raises(shape):
+    game = RichLifeGame(3, 3)
+    with pytest.raises(ValueError):
+        game.stamp_mask(np.ones(shape, bool), 0, 0, mode='xor', wrap=True)
+    assert game.grid.sum() == 0
+
+
+def test_board_sized_wrapped_stamp_and_larger_copy():
+    game = LifeGame(3, 3)
+    game.stamp_mask(np.ones((3, 3), bool), 2, 2, mode='xor', wrap=True)
+    assert game.grid.all()
+    game.stamp_mask(np.ones((5, 5), bool), -1, -1)
+    assert game.grid.all()
+    assert game.copy_region(0, 0, 6, 6, wrap=True).all()
@@ -0,0 +1,206 @@
+import zlib
+
+import numpy as np
+import pytest
+
+from rich_lifegame import RichLifeGame
+from run_recorder import (MAGIC, _FOOTER_OFFSET, _RECORD_HEADER, RunRecorder,
+                          RunReplay, _varint_decode, _varint_encode)
+
+
+def snapshot(game):
+    return {
+        'grid': game.grid.copy(),
+        'cell_age': game.cell_age.copy(),
+        'population_history': [int(p) for p in game.population_history],
+        'birth_count': int(game.birth_count),
+        'death_count': int(game.death_count),
+        'max_age': int(game.max_age),
+    }
+
+
+def assert_same_state(game, expected):
+    actual = snapshot(game)
+    np.testing.assert_array_equal(actual['grid'], expected['grid'])
+    np.testing.assert_array_equal(actual['cell_age'], expected['cell_age'])
+    for key in ('population_history', 'birth_count', 'death_count', 'max_age'):
+        assert actual[key] == expected[key], key
+
+
+def test_replay_every_generation_with_edits(tmp_path):
+    path = tmp_path / 'run.lgr'
+    np.random.seed(1)
+    game = RichLifeGame(30, 24)
+    game.random_pattern(0.3)
+    game.start_recording(path, keyframe_interval=7)
+    snapshots = {game.generation: snapshot(game)}
+
+    for i in range(40):
+        if i == 12:
+            game.set_cell(2, 2, 1)
+            game.set_cell(3, 2, 1)
+        if i == 25:
+            game.set_pulsar(8, 6)
+        snapshots[game.generation] = snapshot(game)
+        game.next_generation()
+        snapshots[game.generation] = snapshot(game)
+    game.stop_recording()
+
+    replayed = RichLifeGame(30, 24)
+    for generation, expected in snapshots.items():
+        replayed.replay_to(path, generation)
+        assert replayed.generation == generation
+        assert_same_state(replayed, expected)
+
+
+def test_resimulating_an_edited_generation_matches_recording(tmp_path):
+    path = tmp_path / 'run.lgr'
+    game = RichLifeGame(40, 40)
+    game.set_glider(1, 1)
+    game.start_recording(path)
+    game.next_generation()
+    game.set_pulsar(20, 20)
+    game.next_generation()
+    expected = snapshot(game)
+    game.stop_recording()
+
+    replayed = RichLifeGame(40, 40)
+    replayed.replay_to(path, 1)
+    assert replayed.grid.sum() == 5 + 48
+    replayed.next_generation()
+    assert_same_state(replayed, expected)
+
+
+def record_with_frames(game, path, generations):
+    frames = [np.packbits(game.grid.astype(bool)).tobytes()]
+    game.start_recording(path)
+    for _ in range(generations):
+        game.next_generation()
+        frames.append(np.packbits(game.grid.astype(bool)).tobytes())
+    game.stop_recording()
+    raw = sum(len(f) for f in frames)
+    compressed = sum(len(zlib.compress(f)) for f in frames)
+    return path.stat().st_size, raw, compressed
+
+
+def test_settled_recording_is_a_small_fraction_of_frames(tmp_path):
+    game = RichLifeGame(60, 60)
+    game.set_gosper_gun(2, 2)
+    game.set_pulsar(40, 40)
+    game.set_pulsar(5, 40)
+    size, raw, compressed = record_with_frames(game, tmp_path / 'run.lgr', 150)
+    assert size < 0.2 * raw
+    assert size < 0.7 * compressed
+
+
+def test_chaotic_recording_is_smaller_than_compressed_frames(tmp_path):
+    np.random.seed(0)
+    game = RichLifeGame(100, 100)
+    game.random_pattern(0.3)
+    size, raw, compressed = record_with_frames(game, tmp_path / 'run.lgr', 200)
+    assert size < 0.5 * raw
+    assert size < 0.9 * compressed
+
+
+def test_unclosed_recording_is_reported(tmp_path):
+    path = tmp_path / 'run.lgr'
+    game = RichLifeGame(10, 10)
+    game.set_glider()
+    recorder = RunRecorder(path, game.width, game.height)
+    recorder.record(game)
+    recorder._file.flush()
+
+    with pytest.raises(ValueError, match='incomplete'):
+        RunReplay(path)
+    recorder.close()
+
+
+def test_restore_rejects_other_grid_size(tmp_path):
+    path = tmp_path / 'run.lgr'
+    game = RichLifeGame(10, 10)
+    game.start_recording(path)
+    game.stop_recording()
+
+    with RunReplay(path) as replay:
+        with pytest.raises(ValueError):
+            replay.restore(RichLifeGame(12, 10), 0)
+        with pytest.raises(KeyError):
+            replay.seek(5)
+
+
+def test_start_recording_is_not_a_context_manager(tmp_path):
+    game = RichLifeGame(10, 10)
+    assert game.start_recording(tmp_path / 'run.lgr') is None
+    game.stop_recording()
+
+
+def test_externally_closed_recorder_is_dropped(tmp_path):
+    path = tmp_path / 'run.lgr'
+    game = RichLifeGame(10, 10)
+    game.set_glider()
+    game.start_recording(path)
+    game.next_generation()
+    game.recorder.close()
+
+    game.next_generation()
+    assert game.recorder is None
+    with RunReplay(path) as replay:
+        assert len(replay) == 2
+
+
+def test_restore_stops_an_active_recording(tmp_path):
+    path = tmp_path / 'run.lgr'
+    game = RichLifeGame(10, 10)
+    game.set_glider()
+    game.start_recording(path)
+    for _ in range(3):
+        game.next_generation()
+    game.stop_recording()
+
+    other = tmp_path / 'other.lgr'
+    game.start_recording(other)
+    with RunReplay(path) as replay:
+        replay.restore(game, 1)
+    assert game.recorder is None
+    game.next_generation()
+    assert game.generation == 2
+    with RunReplay(other) as replay:
+        assert replay.generations == [3]
+
+
+def count_records(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    footer_offset, = _FOOTER_OFFSET.unpack(data[-_FOOTER_OFFSET.size:])
+    pos, count = len(MAGIC), 0
+    while pos < footer_offset:
+        _, length = _RECORD_HEADER.unpack_from(data, pos)
+        pos += _RECORD_HEADER.size + length
+        count += 1
+    return count
+
+
+def test_edited_generation_replaces_its_record(tmp_path):
+    path = tmp_path / 'run.lgr'
+    game = RichLifeGame(20, 20)
+    game.set_glider()
+    game.start_recording(path)
+    expected = {}
+    for i in range(10):
+        game.set_cell(15, 15, i % 2)
+        expected[game.generation] = snapshot(game)
+        game.next_generation()
+    expected[game.generation] = snapshot(game)
+    game.stop_recording()
+
+    assert count_records(path) == 11
+    replayed = RichLifeGame(20, 20)
+    for generation, state in expected.items():
+        replayed.replay_to(path, generation)
+        assert_same_state(replayed, state)
+
+
+def test_varint_round_trip():
+    values = np.array([0, 1, 127, 128, 300, 16383, 16384, 2 ** 35])
+    np.testing.assert_array_equal(_varint_decode(_varint_encode(values)), values)
+    assert _varint_decode(_varint_encode([])).size == 0